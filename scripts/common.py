@@ -0,0 +1,109 @@
+"""
+Helpers shared by the SVG generator scripts.
+
+Scripts are run as `python scripts/<name>.py`, so this module is imported
+as a plain top-level `common`.
+"""
+import os
+from typing import TYPE_CHECKING, Optional, Set, Union
+
+if TYPE_CHECKING:
+    import requests
+
+USER_AGENT = "h4m1dr-profile-stats"
+
+# Directories already created by this process
+_ENSURED_DIRS: Set[str] = set()
+
+
+# -------------------------------
+# HTTP
+# -------------------------------
+
+def make_session(token: Optional[str] = None) -> "requests.Session":
+    """
+    Build the GitHub API session used by every generator.
+
+    Create one per process and pass it around so all requests share the
+    same keep-alive connection pool and TLS handshake.
+    """
+    # Imported here so the offline placeholder generators don't need requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": USER_AGENT,
+    }
+    if token:
+        headers["Authorization"] = f"token {token}"
+    session.headers.update(headers)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    # Pool is larger than any generator's worker count so parallel requests
+    # always reuse keep-alive sockets; transient 5xx/429 GETs are retried with
+    # backoff, honoring Retry-After.
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# -------------------------------
+# Output
+# -------------------------------
+
+def ensure_parent_dir(path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory not in _ENSURED_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _ENSURED_DIRS.add(directory)
+
+
+def write_atomic(path: str, data: Union[bytes, bytearray]) -> None:
+    """
+    Replace path with data in a single step.
+
+    The bytes go to a sibling temp file first and are swapped in with
+    os.replace, so a cancelled job never leaves a half-written SVG behind.
+    """
+    ensure_parent_dir(path)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb", buffering=max(1 << 16, len(data))) as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(path: str, data: Union[bytes, bytearray]) -> bool:
+    """Write data to path unless the file already holds exactly these bytes."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    write_atomic(path, data)
+    return True
+
+
+def format_coord(v: float) -> bytes:
+    # One decimal is plenty for SVG coordinates; "12.0" is written as "12"
+    s = b"%.1f" % v
+    return s[:-2] if s.endswith(b".0") else s
@@ -7,6 +7,11 @@ from collections import defaultdict
 
 import requests
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 GITHUB_GRAPHQL = "https://api.github.com/graphql"
 
 
@@ -43,7 +48,7 @@ def run_graphql_query(query: str, variables: dict, token: str) -> dict:
     if resp.status_code != 200:
         print("GraphQL error:", resp.status_code, resp.text, file=sys.stderr)
         sys.exit(1)
-    data = resp.json()
+    data = json_loads(resp.content)
     if "errors" in data:
         print("GraphQL returned errors:", data["errors"], file=sys.stderr)
         sys.exit(1)
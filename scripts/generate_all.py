@@ -0,0 +1,26 @@
+"""
+Run every SVG generator in a single process.
+
+The top-languages generator is the only one that talks to GitHub; running
+everything here lets it share one configured session (connection pool,
+retries, auth headers) instead of each script setting up its own.
+"""
+import generate_monthly_activity_svg
+import generate_top_langs_svg
+import generate_wakatime_svg
+import generate_weekly_activity_svg
+from common import make_session
+
+
+def main() -> None:
+    session = make_session(generate_top_langs_svg.TOKEN)
+
+    generate_top_langs_svg.generate(session)
+    generate_weekly_activity_svg.generate()
+    generate_monthly_activity_svg.generate()
+    generate_wakatime_svg.generate()
+    print("[INFO] Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
 import os
 from datetime import datetime, timezone
 
+from common import format_coord, write_atomic
+
+# One bar with its label underneath and its value on top, filled with bytes %-formatting
+_BAR_TPL = (
+    b'<rect x="%d" y="%s" width="%d" height="%s" rx="6" fill="#a3be8c"/>'
+    b'<text x="%s" y="%d" text-anchor="middle" class="label">%s</text>'
+    b'<text x="%s" y="%s" text-anchor="middle" class="hours">%.1fh</text>'
+)
+
 
 def generate_monthly_svg(output_path: str) -> None:
     """
@@ -25,58 +34,58 @@ def generate_monthly_svg(output_path: str) -> None:
     chart_bottom = 150
     chart_height = 90
 
-    svg = []
-    svg.append(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">')
-    svg.append(
-        '<style>'
-        '.title{font:bold 18px sans-serif;fill:#eceff4;}'
-        '.label{font:12px sans-serif;fill:#e5e9f0;}'
-        '.hours{font:12px monospace;fill:#eceff4;}'
-        '</style>'
+    buf = bytearray()
+    w = buf.extend
+    w(b'<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d">' % (width, height))
+    w(
+        b'<style>'
+        b'.title{font:bold 18px sans-serif;fill:#eceff4}'
+        b'.label{font:12px sans-serif;fill:#e5e9f0}'
+        b'.hours{font:12px monospace;fill:#eceff4}'
+        b'</style>'
     )
 
-    svg.append(f'<rect width="100%" height="100%" fill="{bg}" rx="16" />')
-    svg.append('<text x="24" y="32" class="title">Monthly Activity (placeholder)</text>')
-    svg.append(
+    w(b'<rect width="100%%" height="100%%" fill="%s" rx="16"/>' % bg.encode("ascii"))
+    w(b'<text x="24" y="32" class="title">Monthly Activity (placeholder)</text>')
+    w((
         '<text x="24" y="52" class="label">'
         'Sample weekly totals – real GitHub data integration coming soon.'
         '</text>'
-    )
+    ).encode("utf-8"))
 
-    for idx, (week, h) in enumerate(zip(weeks, hours)):
-        x = chart_left + idx * (bar_width + bar_gap)
-        bar_height = (h / max_hours) * chart_height
+    height_scale = chart_height / max_hours
+    label_y = chart_bottom + 16
+    xs = [chart_left + idx * (bar_width + bar_gap) for idx in range(len(weeks))]
+
+    for x, week, h in zip(xs, weeks, hours):
+        bar_height = h * height_scale
         y = chart_bottom - bar_height
+        cx = format_coord(x + bar_width/2)
+
+        w(_BAR_TPL % (
+            x, format_coord(y), bar_width, format_coord(bar_height),
+            cx, label_y, week.encode("ascii"),
+            cx, format_coord(y - 4), h,
+        ))
 
-        svg.append(
-            f'<rect x="{x}" y="{y}" width="{bar_width}" height="{bar_height}" '
-            f'rx="6" fill="#a3be8c" />'
-        )
-        svg.append(
-            f'<text x="{x + bar_width/2}" y="{chart_bottom + 16}" '
-            f'text-anchor="middle" class="label">{week}</text>'
-        )
-        svg.append(
-            f'<text x="{x + bar_width/2}" y="{y - 4}" text-anchor="middle" '
-            f'class="hours">{h:.1f}h</text>'
-        )
-
-    svg.append(
-        f'<text x="24" y="{height - 16}" class="label">'
-        f'Last updated on {updated_at}</text>'
+    w(
+        b'<text x="24" y="%d" class="label">'
+        b'Last updated on %s</text>' % (height - 16, updated_at.encode("ascii"))
     )
 
-    svg.append('</svg>')
+    w(b'</svg>')
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(svg))
+    write_atomic(output_path, buf)
 
 
-def main() -> None:
+def generate() -> None:
     output_path = os.path.join("assets", "monthly_activity.svg")
     print(f"[INFO] Generating monthly activity SVG at {output_path}")
     generate_monthly_svg(output_path)
+
+
+def main() -> None:
+    generate()
     print("[INFO] Done.")
 
 
@@ -1,99 +1,297 @@
+"""
+Generate the Top Languages donut SVG (assets/top_langs.svg).
+
+Performance note: this script is network-bound. GitHub API round trips
+dominate the runtime; rendering the SVG takes microseconds. Optimize by
+reducing request count (GraphQL), parallelizing (thread pool) or caching
+(ETag / totals cache) -- not by micro-tuning the SVG builder.
+"""
 import os
+import json
 import math
+import time
 import requests
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from heapq import nlargest
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from common import ensure_parent_dir, format_coord, make_session, write_if_changed
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
 USERNAME = os.environ.get("GITHUB_USERNAME", "h4m1dr")
 TOKEN = os.environ.get("GITHUB_TOKEN")
 
+# Per-repo language lookups are independent, so they are fetched concurrently.
+MAX_WORKERS = 16
+
+# URL -> {"etag", "body"} for conditional requests. A 304 skips the body
+# download and JSON decode; it is only exempt from the rate limit when the
+# request is authenticated, which the REST fallback never is.
+ETAG_CACHE_PATH = os.path.join(".cache", "etag_cache.json")
+
+# Aggregated totals are reused for this long before hitting the API again
+TOTALS_CACHE_TTL = 6 * 60 * 60
+
+# Number of languages shown in the donut and legend
+TOP_N = 6
+
+# Segment / legend colors, in ranking order
+PALETTE = ["#5e81ac", "#a3be8c", "#ebcb8b", "#bf616a", "#b48ead", "#88c0d0"]
+
+# Per-row markup, filled once per language with bytes %-formatting
+_SLICE_TPL = (
+    b'<circle cx="%d" cy="%d" r="%d" fill="none" '
+    b'stroke="%s" stroke-width="%d" '
+    b'stroke-dasharray="%s %s" '
+    b'stroke-dashoffset="%s" stroke-linecap="round"/>'
+)
+_LEGEND_TPL = (
+    b'<rect x="%d" y="%d" width="14" height="14" rx="3" fill="%s"/>'
+    b'<text x="%d" y="%d" class="legend">%s</text>'
+    b'<text x="%d" y="%d" class="percent">%s</text>'
+)
+
+# Written as-is when there is nothing to chart
+_NO_DATA_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="600" height="120">'
+    '<style>.empty{font:16px sans-serif;fill:#eceff4}</style>'
+    '<rect width="100%" height="100%" fill="#2e3440"/>'
+    '<text x="50%" y="50%" text-anchor="middle" class="empty">'
+    'No language data available</text>'
+    '</svg>'
+).encode("utf-8")
+
 
 # -------------------------------
 # Fetching GitHub repository data
 # -------------------------------
 
-def get_session() -> requests.Session:
-    session = requests.Session()
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "h4m1dr-profile-stats",
-    }
-    if TOKEN:
-        headers["Authorization"] = f"token {TOKEN}"
-    session.headers.update(headers)
-    return session
+def _json(resp: requests.Response) -> Any:
+    # Parse the raw body bytes directly, skipping requests' text decoding
+    return _json_loads(resp.content)
+
+
+def load_etag_cache(path: str = ETAG_CACHE_PATH) -> Dict[str, Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_etag_cache(cache: Dict[str, Dict], path: str = ETAG_CACHE_PATH) -> None:
+    ensure_parent_dir(path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+
+def cached_get(
+    session: requests.Session,
+    url: str,
+    etag_cache: Optional[Dict[str, Dict]] = None,
+) -> Any:
+    """
+    GET a GitHub JSON resource, revalidating against a stored ETag.
+
+    On 304 the cached body is returned without downloading or parsing anything.
+    """
+    cached = etag_cache.get(url) if etag_cache is not None else None
+    headers = {"If-None-Match": cached["etag"]} if cached else None
+
+    resp = session.get(url, headers=headers, timeout=20)
+    if cached and resp.status_code == 304:
+        return cached["body"]
+
+    resp.raise_for_status()
+    body = _json(resp)
 
+    etag = resp.headers.get("ETag")
+    if etag_cache is not None and etag:
+        etag_cache[url] = {"etag": etag, "body": body}
+    return body
 
-def fetch_repos(session: requests.Session, username: str) -> List[Dict]:
+
+def fetch_repos(
+    session: requests.Session,
+    username: str,
+    etag_cache: Optional[Dict[str, Dict]] = None,
+) -> List[Dict]:
     repos: List[Dict] = []
     page = 1
+    per_page = 100
 
     while True:
-        resp = session.get(
-            f"{GITHUB_API_URL}/users/{username}/repos",
-            params={"per_page": 100, "page": page, "type": "owner"},
-            timeout=20,
+        # Search filters forks server-side; the query string is part of the
+        # URL so each page gets its own cache entry
+        data = cached_get(
+            session,
+            f"{GITHUB_API_URL}/search/repositories"
+            f"?q=user:{username}+fork:false&per_page={per_page}&page={page}",
+            etag_cache,
         )
-        resp.raise_for_status()
-        data = resp.json()
+        items = data["items"]
 
-        if not data:
+        if not items:
             break
 
-        for repo in data:
-            if not repo.get("fork", False):
-                repos.append(repo)
+        repos.extend(items)
+
+        # A short page is the last one; skip the round trip for an empty page
+        if len(items) < per_page:
+            break
 
         page += 1
 
     return repos
 
 
-def fetch_repo_languages(session: requests.Session, owner: str, repo_name: str) -> Dict[str, int]:
-    resp = session.get(
-        f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/languages",
-        timeout=20,
-    )
-    resp.raise_for_status()
-    return resp.json()
+def fetch_repo_languages(
+    session: requests.Session,
+    owner: str,
+    repo_name: str,
+    etag_cache: Optional[Dict[str, Dict]] = None,
+) -> Dict[str, int]:
+    return cached_get(session, f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/languages", etag_cache)
+
+
+def aggregate_languages(
+    session: requests.Session,
+    repos: List[Dict],
+    etag_cache: Optional[Dict[str, Dict]] = None,
+) -> Tuple[Dict[str, int], int]:
+    """Sum language bytes across repos; also returns how many lookups failed."""
+    totals: Dict[str, int] = defaultdict(int)
+    failures = 0
+    # Repos with no detected language or zero size always report {}, so the
+    # listing data is enough to skip their languages request
+    targets = [
+        (repo["owner"]["login"], repo["name"])
+        for repo in repos
+        if repo.get("language") and repo.get("size", 0)
+    ]
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_repo_languages, session, owner, name, etag_cache): name
+            for owner, name in targets
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                langs = future.result()
+            except Exception as e:
+                print(f"[WARN] Failed to fetch languages for {name}: {e}")
+                failures += 1
+                continue
+
+            for lang, bytes_count in langs.items():
+                totals[lang] += bytes_count
+
+    return totals, failures
+
+
+LANGUAGES_QUERY = """
+query($login: String!, $after: String) {
+  user(login: $login) {
+    repositories(first: 100, ownerAffiliations: OWNER, isFork: false, privacy: PUBLIC, after: $after) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        languages(first: 20) {
+          edges {
+            size
+            node {
+              name
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
 
 
-def aggregate_languages(session: requests.Session, repos: List[Dict]) -> Dict[str, int]:
+def fetch_languages_graphql(session: requests.Session, username: str) -> Dict[str, int]:
+    """
+    Aggregate language bytes for all owned, public, non-fork repos via GraphQL.
+
+    Returns up to 100 repos with their languages per request, instead of
+    one REST call per repo. Requires an authenticated session.
+    """
     totals: Dict[str, int] = defaultdict(int)
+    cursor = None
 
-    for repo in repos:
-        name = repo["name"]
-        owner = repo["owner"]["login"]
+    while True:
+        resp = session.post(
+            GITHUB_GRAPHQL_URL,
+            json={"query": LANGUAGES_QUERY, "variables": {"login": username, "after": cursor}},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        data = _json(resp)
 
-        try:
-            langs = fetch_repo_languages(session, owner, name)
-        except Exception as e:
-            print(f"[WARN] Failed to fetch languages for {name}: {e}")
-            continue
+        if "errors" in data:
+            raise RuntimeError(f"GraphQL returned errors: {data['errors']}")
 
-        for lang, bytes_count in langs.items():
-            totals[lang] += int(bytes_count)
+        repositories = data["data"]["user"]["repositories"]
+        for repo in repositories["nodes"]:
+            for edge in repo["languages"]["edges"]:
+                totals[edge["node"]["name"]] += edge["size"]
+
+        page_info = repositories["pageInfo"]
+        if not page_info["hasNextPage"]:
+            break
+        cursor = page_info["endCursor"]
 
     return totals
 
 
-def compute_percentages(language_totals: Dict[str, int]) -> List[Tuple[str, float]]:
+def totals_cache_path(username: str) -> str:
+    return os.path.join(".cache", f"lang_totals_{username}.json")
+
+
+def load_cached_totals(username: str, ttl: float = TOTALS_CACHE_TTL) -> Optional[Dict[str, int]]:
+    path = totals_cache_path(username)
+    try:
+        if time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_totals(username: str, totals: Dict[str, int]) -> None:
+    path = totals_cache_path(username)
+    ensure_parent_dir(path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(totals, f)
+
+
+def compute_percentages(language_totals: Dict[str, int], top_n: int = TOP_N) -> List[Tuple[str, float]]:
+    """Return the top_n languages by share of total bytes, largest first."""
     total = sum(language_totals.values())
     if total == 0:
         return []
 
-    result = [
-        (lang, (count / total) * 100.0)
-        for lang, count in language_totals.items()
-    ]
-
-    result.sort(key=lambda x: x[1], reverse=True)
-    return result
+    top = nlargest(top_n, language_totals.items(), key=itemgetter(1))
+    return [(lang, (count / total) * 100.0) for lang, count in top]
 
 
-def format_percentage(v: float) -> str:
-    return f"{v:.1f}%"
+def format_percentage(v: float) -> bytes:
+    return b"%.1f%%" % v
 
 
 # -------------------------------
@@ -105,25 +303,14 @@ def generate_svg(lang_percentages: List[Tuple[str, float]], output_path: str) ->
     Draws a donut chart SVG for top languages.
     Smaller radius + larger fonts.
     """
-    top_n = 6
-    langs = lang_percentages[:top_n]
+    langs = lang_percentages[:TOP_N]
 
     width = 600
     height = 260
     bg = "#2e3440"
 
     if not langs:
-        svg = f"""
-<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="120">
-  <rect width="100%" height="100%" fill="{bg}" />
-  <text x="50%" y="50%" text-anchor="middle" fill="#eceff4" font-size="16">
-    No language data available
-  </text>
-</svg>
-"""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(svg)
+        write_if_changed(output_path, _NO_DATA_SVG)
         return
 
     # Donut geometry (smaller)
@@ -132,86 +319,105 @@ def generate_svg(lang_percentages: List[Tuple[str, float]], output_path: str) ->
     stroke_width = 24
     circumference = 2 * math.pi * radius
 
-    palette = ["#5e81ac", "#a3be8c", "#ebcb8b", "#bf616a", "#b48ead", "#88c0d0"]
+    # Shared by the ring segments and the legend swatches
+    seg_colors = [PALETTE[i % len(PALETTE)].encode("ascii") for i in range(len(langs))]
+    bg_b = bg.encode("ascii")
 
-    svg = []
-    svg.append(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">')
+    buf = bytearray()
+    w = buf.extend
+    w(b'<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d">' % (width, height))
 
-    svg.append(
-        '<style>'
-        '.title{font:bold 20px sans-serif;fill:#eceff4;}'
-        '.legend{font:13px sans-serif;fill:#eceff4;}'
-        '.percent{font:13px monospace;fill:#eceff4;}'
-        '</style>'
+    w(
+        b'<style>'
+        b'.title{font:bold 20px sans-serif;fill:#eceff4}'
+        b'.legend{font:13px sans-serif;fill:#eceff4}'
+        b'.percent{font:13px monospace;fill:#eceff4}'
+        b'</style>'
     )
 
-    svg.append(f'<rect width="100%" height="100%" fill="{bg}" rx="16" />')
-    svg.append(f'<text x="24" y="32" class="title">Top Languages – {USERNAME}</text>')
+    w(b'<rect width="100%%" height="100%%" fill="%s" rx="16"/>' % bg_b)
+    w(f'<text x="24" y="32" class="title">Top Languages – {USERNAME}</text>'.encode("utf-8"))
 
     # Background ring
-    svg.append(
-        f'<circle cx="{cx}" cy="{cy}" r="{radius}" '
-        f'stroke="#3b4252" stroke-width="{stroke_width}" fill="none" />'
+    w(
+        b'<circle cx="%d" cy="%d" r="%d" '
+        b'stroke="#3b4252" stroke-width="%d" fill="none"/>' % (cx, cy, radius, stroke_width)
     )
 
     # Draw segments
     offset = -0.25 * circumference
-    for i, (lang, perc) in enumerate(langs):
-        seg_len = circumference * (perc / 100)
-        color = palette[i % len(palette)]
-
-        svg.append(
-            f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="none" '
-            f'stroke="{color}" stroke-width="{stroke_width}" '
-            f'stroke-dasharray="{seg_len:.2f} {circumference - seg_len:.2f}" '
-            f'stroke-dashoffset="{offset:.2f}" stroke-linecap="round" />'
-        )
+    seg_scale = circumference / 100.0
+    for (lang, perc), color in zip(langs, seg_colors):
+        seg_len = seg_scale * perc
+
+        w(_SLICE_TPL % (
+            cx, cy, radius, color, stroke_width,
+            format_coord(seg_len), format_coord(circumference - seg_len), format_coord(offset),
+        ))
 
         offset -= seg_len
 
     # Inner hole
-    svg.append(
-        f'<circle cx="{cx}" cy="{cy}" r="{radius - stroke_width/2 + 4}" fill="{bg}" />'
+    w(
+        b'<circle cx="%d" cy="%d" r="%d" fill="%s"/>'
+        % (cx, cy, radius - stroke_width // 2 + 4, bg_b)
     )
 
     # Legend
     lx, ly = 250, 80
     row_h = 24
+    name_x, percent_x = lx + 22, lx + 160
+    legend_ys = [ly + i * row_h for i in range(len(langs))]
 
-    for i, (lang, perc) in enumerate(langs):
-        color = palette[i % len(palette)]
-        y = ly + i * row_h
+    for (lang, perc), color, y in zip(langs, seg_colors, legend_ys):
+        w(_LEGEND_TPL % (
+            lx, y - 12, color,
+            name_x, y, lang.encode("utf-8"),
+            percent_x, y, format_percentage(perc),
+        ))
 
-        svg.append(
-            f'<rect x="{lx}" y="{y - 12}" width="14" height="14" rx="3" fill="{color}" />'
-        )
-        svg.append(
-            f'<text x="{lx + 22}" y="{y}" class="legend">{lang}</text>'
-        )
-        svg.append(
-            f'<text x="{lx + 160}" y="{y}" class="percent">{format_percentage(perc)}</text>'
-        )
-
-    svg.append("</svg>")
+    w(b"</svg>")
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(svg))
+    # Unchanged data leaves the file (and its mtime) untouched
+    write_if_changed(output_path, buf)
 
 
 # -------------------------------
 # Main runner
 # -------------------------------
 
-def main():
+def generate(session: Optional[requests.Session] = None) -> None:
+    """Render assets/top_langs.svg, reusing the caller's session if given."""
     print(f"[INFO] Generating top languages donut for: {USERNAME}")
 
-    session = get_session()
-    repos = fetch_repos(session, USERNAME)
-    totals = aggregate_languages(session, repos)
+    totals = load_cached_totals(USERNAME)
+    if totals is not None:
+        print("[INFO] Using cached language totals")
+    else:
+        session = session or make_session(TOKEN)
+        failures = 0
+        if TOKEN:
+            totals = fetch_languages_graphql(session, USERNAME)
+        else:
+            # GraphQL needs a token; fall back to the REST listing + per-repo calls
+            etag_cache = load_etag_cache()
+            repos = fetch_repos(session, USERNAME, etag_cache)
+            totals, failures = aggregate_languages(session, repos, etag_cache)
+            save_etag_cache(etag_cache)
+
+        # Partial or empty totals would be served for the whole TTL
+        if failures or not totals:
+            print(f"[WARN] Not caching language totals ({failures} failed lookups)")
+        else:
+            save_cached_totals(USERNAME, totals)
+
     percentages = compute_percentages(totals)
 
     generate_svg(percentages, os.path.join("assets", "top_langs.svg"))
+
+
+def main():
+    generate()
     print("[INFO] Done.")
 
 
@@ -1,6 +1,35 @@
 import os
 from datetime import datetime, timezone
 
+from common import write_atomic
+
+WIDTH = 600
+HEIGHT = 180
+BG = "#2e3440"
+
+# Everything but the timestamp is static, so the markup is encoded once and
+# split around the "Last updated" value.
+_SVG_HEAD = (
+    f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}">'
+    '<style>'
+    '.title{font:bold 18px sans-serif;fill:#eceff4}'
+    '.label{font:13px sans-serif;fill:#e5e9f0}'
+    '.mono{font:13px monospace;fill:#eceff4}'
+    '</style>'
+    f'<rect width="100%" height="100%" fill="{BG}" rx="16"/>'
+    '<text x="24" y="32" class="title">WakaTime (placeholder)</text>'
+    '<text x="24" y="56" class="label">'
+    'Real coding time from WakaTime API will appear here.'
+    '</text>'
+    '<text x="24" y="84" class="label">'
+    'To enable this, add your WakaTime API key as a GitHub secret and '
+    'update the generator script.'
+    '</text>'
+    f'<text x="24" y="{HEIGHT - 16}" class="mono">'
+    'Last updated on '
+).encode("utf-8")
+_SVG_TAIL = b'</text></svg>'
+
 
 def generate_wakatime_svg(output_path: str) -> None:
     """
@@ -9,53 +38,19 @@ def generate_wakatime_svg(output_path: str) -> None:
     Real WakaTime API integration will be added later.
     """
 
-    width = 600
-    height = 180
-    bg = "#2e3440"
-
     updated_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
-    svg = []
-    svg.append(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">')
-    svg.append(
-        '<style>'
-        '.title{font:bold 18px sans-serif;fill:#eceff4;}'
-        '.label{font:13px sans-serif;fill:#e5e9f0;}'
-        '.mono{font:13px monospace;fill:#eceff4;}'
-        '</style>'
-    )
-
-    svg.append(f'<rect width="100%" height="100%" fill="{bg}" rx="16" />')
-    svg.append('<text x="24" y="32" class="title">WakaTime (placeholder)</text>')
-    svg.append(
-        '<text x="24" y="56" class="label">'
-        'Real coding time from WakaTime API will appear here.'
-        '</text>'
-    )
-
-    svg.append(
-        '<text x="24" y="84" class="label">'
-        'To enable this, add your WakaTime API key as a GitHub secret and '
-        'update the generator script.'
-        '</text>'
-    )
-
-    svg.append(
-        f'<text x="24" y="{height - 16}" class="mono">'
-        f'Last updated on {updated_at}</text>'
-    )
-
-    svg.append('</svg>')
-
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(svg))
+    write_atomic(output_path, _SVG_HEAD + updated_at.encode("ascii") + _SVG_TAIL)
 
 
-def main() -> None:
+def generate() -> None:
     output_path = os.path.join("assets", "wakatime.svg")
     print(f"[INFO] Generating WakaTime SVG at {output_path}")
     generate_wakatime_svg(output_path)
+
+
+def main() -> None:
+    generate()
     print("[INFO] Done.")
 
 